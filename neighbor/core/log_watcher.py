@@ -1,5 +1,5 @@
 import os
-import time
+import queue
 from data.sources_interface import Sources
 
 """
@@ -7,6 +7,11 @@ This module is the main entry point for the log watcher.
 It initializes the log sources and starts monitoring the selected sources.
 """
 
+# Drain threshold: after a wakeup, keep taking ready batches off out_q
+# until at least this many events are collected. Batches are never split,
+# so one wakeup can handle more than this.
+EVENT_BATCH_SIZE = 500
+
 class Watcher:
     def __init__(self):
         self.cpu_count = os.cpu_count() or 1
@@ -22,14 +27,39 @@ class Watcher:
             data.start()
             
             while self.running:
-                events = data.poll()
-                if events:
-                    print(f"Received {len(events)} new events.")
-                    # Simple print of last few events for demo
-                    for ev in events[-5:]:
-                        print(f"[{ev.severity.name}] {ev.timestamp}: {ev.raw_message[:100]}")
-                
-                time.sleep(0.5) # Polling interval
+                # Block until a source pushes a batch, then drain what is ready
+                # until EVENT_BATCH_SIZE is reached
+                # (a source whose reader failed puts the exception instead)
+                try:
+                    source, batch = data.out_q.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if isinstance(batch, Exception):
+                    raise batch
+                acks = [(source, batch.checkpoint)]
+
+                while len(batch) < EVENT_BATCH_SIZE:
+                    try:
+                        source, more = data.out_q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(more, Exception):
+                        raise more
+                    batch.extend(more)
+                    acks.append((source, more.checkpoint))
+
+                print(f"Received {len(batch)} new events.")
+                # Simple print of last few events for demo
+                for i in range(max(len(batch) - 5, 0), len(batch)):
+                    ev = batch[i]
+                    msg = ev.raw_message[:100]
+                    if isinstance(msg, bytes):
+                        msg = msg.decode('utf-8', errors='replace')
+                    print(f"[{ev.severity.name}] {ev.timestamp}: {msg}")
+
+                # Handled: let each source advance its persisted position
+                for source, checkpoint in acks:
+                    source.ack(checkpoint)
                 
         except Exception as e:
             print(f"Error: {e}")
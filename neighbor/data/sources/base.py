@@ -4,14 +4,21 @@ Base classes and contracts for log sources.
 
 All log sources must:
 1. Inherit from LogSource
-2. Return LogEvent instances
+2. Return LogEvent instances, collected in a LogEventBatch
+3. Deliver those batches by putting them on out_q from their own thread
 """
 
-from dataclasses import dataclass
+import queue
+from array import array
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 from enum import Enum
 
 
+# Batches a source may leave unread on its out_q before it blocks
+OUT_QUEUE_SIZE = 32
+
+
 class Severity(Enum):
     DEBUG = 1
     INFO = 2
@@ -19,7 +26,7 @@ class Severity(Enum):
     ERROR = 4
     CRITICAL = 5
 
-@dataclass
+@dataclass(slots=True)
 class LogEvent:
     """
     A log event from any source.
@@ -28,14 +35,82 @@ class LogEvent:
     severity: Severity
     timestamp: int        # Unix timestamp in seconds
     subsystem: str        # e.g., 'NetworkManager.service', 'iwlwifi'
-    raw_message: str      # MUST be sanitized - no IPs, usernames, emails
+    raw_message: bytes | str  # MUST be sanitized - no IPs, usernames, emails
     structured_data: dict # Source-specific metadata
 
 
+@dataclass(slots=True)
+class LogEventBatch:
+    """
+    Columnar batch of log events.
+    Severity and timestamp live in typed arrays so they can be scanned in bulk.
+    """
+    source: list[str] = field(default_factory=list)
+    severity: array = field(default_factory=lambda: array('B'))   # Severity values
+    timestamp: array = field(default_factory=lambda: array('q'))  # Unix timestamps in seconds
+    subsystem: list[str] = field(default_factory=list)
+    raw_message: list[bytes | str] = field(default_factory=list)
+    structured_data: list[dict] = field(default_factory=list)
+    checkpoint: object = None  # Source position after this batch, see LogSource.ack
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, index: int) -> LogEvent:
+        return LogEvent(
+            self.source[index],
+            Severity(self.severity[index]),
+            self.timestamp[index],
+            self.subsystem[index],
+            self.raw_message[index],
+            self.structured_data[index],
+        )
+
+    def append(self, event: LogEvent):
+        self.source.append(event.source)
+        self.severity.append(event.severity.value)
+        self.timestamp.append(event.timestamp)
+        self.subsystem.append(event.subsystem)
+        self.raw_message.append(event.raw_message)
+        self.structured_data.append(event.structured_data)
+
+    def slice(self, start: int, stop: int) -> "LogEventBatch":
+        return LogEventBatch(
+            self.source[start:stop],
+            self.severity[start:stop],
+            self.timestamp[start:stop],
+            self.subsystem[start:stop],
+            self.raw_message[start:stop],
+            self.structured_data[start:stop],
+        )
+
+    def extend(self, other: "LogEventBatch"):
+        self.source.extend(other.source)
+        self.severity.extend(other.severity)
+        self.timestamp.extend(other.timestamp)
+        self.subsystem.extend(other.subsystem)
+        self.raw_message.extend(other.raw_message)
+        self.structured_data.extend(other.structured_data)
+
+
 class LogSource(ABC):
     """
     Base class for log sources.
+
+    Events reach consumers only through out_q, which Sources shares between
+    all sources. Between start() and stop() a source reads in its own
+    thread and puts (source, batch) for each non-empty LogEventBatch on
+    out_q. If reading fails, it puts (source, exception) instead, so the
+    consumer can raise it.
+
+    A batch read past a persisted position carries the new position as
+    batch.checkpoint. The consumer hands it back through ack() once the
+    batch is handled. Only acknowledged checkpoints may be persisted, so
+    events still queued at shutdown are read again on the next start.
     """
+
+    def __init__(self, out_q: queue.Queue = None):
+        self.out_q = out_q if out_q is not None else queue.Queue(maxsize=OUT_QUEUE_SIZE)
     
     @abstractmethod
     def start(self):
@@ -44,21 +119,32 @@ class LogSource(ABC):
         - validate permissions
         - load checkpoints (if any)
         - initialize cursors / offsets
+        - start the thread that feeds out_q
         """
         pass
 
     @abstractmethod
-    def poll(self) -> list[LogEvent]:
+    def poll(self) -> LogEventBatch:
         """
-        - Returns a list of log events since the last poll.
-        - The list should be empty if no new logs are available.
+        - Called by the source's own thread, not by consumers.
+        - Returns a batch of log events since the last poll.
+        - The batch should be empty if no new logs are available.
         - All returned LogEvents MUST have sanitized raw_message.
         """
         pass
 
+    def ack(self, checkpoint):
+        """
+        - Called by the consumer once a batch from this source is handled.
+        - checkpoint is that batch's checkpoint (None if it carried none).
+        - Sources that persist a position save only acknowledged checkpoints.
+        """
+        pass
+
     @abstractmethod
     def stop(self):
         """
+        - stop the thread that feeds out_q
         - close file descriptors
         - flush buffers
         - persist cursor state (optional)
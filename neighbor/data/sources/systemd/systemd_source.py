@@ -1,12 +1,15 @@
 import os
+import pickle
+import sys
 import queue
+import selectors
 import threading
+import collections
 import multiprocessing
-import systemd.journal
 from enum import Enum
 from pathlib import Path
-from datetime import datetime, timedelta
-from ..base import LogSource, LogEvent, Severity
+from datetime import datetime
+from ..base import LogSource, LogEventBatch, Severity
 
 class TimePeriod(Enum):
     ALL = "all"
@@ -14,147 +17,364 @@ class TimePeriod(Enum):
     NOW = "now"
     CUSTOM = "custom"
 
-def _map_priority_to_severity(priority):
-    """Map systemd priority (0-7) to Severity enum."""
+# Journal fields copied into structured_data
+_KEEP = (
+    '_PID', '_UID', '_COMM', '_HOSTNAME', '_SYSTEMD_UNIT', '_TRANSPORT',
+    '_KERNEL_SUBSYSTEM', '_KERNEL_DEVICE', 'CODE_FILE', 'CODE_LINE',
+)
+
+# Severity value for each systemd priority (0-7), indexed by priority.
+# Plain values, since that is what LogEventBatch.severity stores.
+_ERROR, _WARNING, _INFO, _DEBUG = (
+    Severity.ERROR.value, Severity.WARNING.value, Severity.INFO.value, Severity.DEBUG.value,
+)
+_PRIO_TO_SEV = (_ERROR, _ERROR, _ERROR, _ERROR, _WARNING, _INFO, _INFO, _DEBUG)
+
+# History entries less severe than this are skipped before their fields are
+# fetched; the live tail keeps everything. Filtered in _read_chunk rather
+# than with journal PRIORITY matches, which would also drop entries that
+# have no PRIORITY field (e.g. audit).
+HISTORY_MIN_SEVERITY = Severity.INFO.value
+
+def _priority_to_severity(priority):
+    """
+    Map a journal PRIORITY to a Severity value. The field is free-form, so
+    values outside 0-7 are clamped and unparsable ones fall back to INFO.
+    """
     if priority is None:
-        return Severity.INFO
-    elif priority <= 3:
-        return Severity.ERROR
-    elif priority == 4:
-        return Severity.WARNING
-    elif priority <= 6:
-        return Severity.INFO
-    else:
-        return Severity.DEBUG
+        return _INFO
+    try:
+        priority = int(priority)
+    except (TypeError, ValueError):
+        return _INFO
+    if 0 <= priority <= 7:
+        return _PRIO_TO_SEV[priority]
+    return _DEBUG if priority > 7 else _ERROR
 
-def _entry_to_dict(entry):
-    """Convert a journal entry to a LogEvent dict."""
+# Keep MESSAGE as raw bytes; it is only decoded where text is actually needed
+_RAW_CONVERTERS = {'MESSAGE': bytes}
+
+def _convert(convert, key, value):
+    """Apply a reader's field converter to one raw value (or list of values)."""
+    if isinstance(value, list):
+        return [convert(key, v) for v in value]
+    return convert(key, value)
+
+def _append_entry(batch, entry, timestamp, severity, convert):
+    """
+    Append a raw journal entry (as returned by _get_all) straight into
+    batch's columns, without building a LogEvent. timestamp is in Unix
+    seconds, severity a value from _priority_to_severity; convert is the
+    reader's _convert_field.
+
+    Only the fields that are kept get converted. MESSAGE stays bytes.
+    """
     msg = entry.get('MESSAGE')
     if not msg:
-        return None
+        return
     
-    if isinstance(msg, bytes):
-        msg = msg.decode('utf-8', errors='replace')
+    subsystem = entry.get('SYSLOG_IDENTIFIER')
+    if subsystem:
+        subsystem = _convert(convert, 'SYSLOG_IDENTIFIER', subsystem)
+    else:
+        unit = entry.get('_SYSTEMD_UNIT')
+        subsystem = _convert(convert, '_SYSTEMD_UNIT', unit) if unit else 'unknown'
     
-    return {
-        'source': 'systemd',
-        'severity': _map_priority_to_severity(entry.get('PRIORITY')),
-        'timestamp': entry.get('__REALTIME_TIMESTAMP'),
-        'subsystem': entry.get('SYSLOG_IDENTIFIER') or entry.get('_SYSTEMD_UNIT') or 'unknown',
-        'raw_message': msg,
-        'structured_data': {k: v for k, v in entry.items() if isinstance(v, (str, int, float, bool))}
-    }
+    batch.source.append('systemd')
+    batch.severity.append(severity)
+    batch.timestamp.append(timestamp)
+    batch.subsystem.append(subsystem)
+    batch.raw_message.append(msg)
+    batch.structured_data.append({k: _convert(convert, k, entry[k]) for k in _KEEP if k in entry})
 
-def process_log_chunk(args):
-    """Worker function to process a specific time range of logs."""
-    # Lower priority of this worker process
+# Historical events buffered for poll(), and the size of the slices the
+# scan adds per lock (one poll() takes one slice)
+HISTORY_QUEUE_SIZE = 2048
+HISTORY_PUT_BATCH = 1024
+
+# Number of matching entries between sampled chunk boundary cursors
+HISTORY_SAMPLE_STRIDE = 10_000
+
+# Chunks per worker, and the most chunks the pool hands out per dispatch.
+# Many small chunks keep each result pickle small and the workers busy.
+HISTORY_CHUNKS_PER_CORE = 32
+HISTORY_POOL_CHUNKSIZE = 4
+
+def _journal():
+    """Return systemd.journal, imported on first use so loading this module doesn't pull in libsystemd."""
+    import systemd.journal
+    return systemd.journal
+
+def _open_reader():
+    """Open a journal reader with the converters every reader of this source uses."""
+    return _journal().Reader(converters=_RAW_CONVERTERS)
+
+def _head_time(reader):
+    """Time of the first entry the reader matches, or None if there is none."""
+    reader.seek_head()
+    if not reader._next():
+        return None
+    return datetime.fromtimestamp(reader._get_realtime() / 1_000_000)
+
+def _tail_time(reader):
+    """Time of the last entry the reader matches, or None if there is none."""
+    reader.seek_tail()
+    if not reader._previous():
+        return None
+    return datetime.fromtimestamp(reader._get_realtime() / 1_000_000)
+
+def _lower_thread_priority():
+    """
+    Lower the calling thread's priority by 10, like os.nice(10) for a process.
+    Linux schedules threads individually, so only this thread is affected.
+    """
+    try:
+        tid = threading.get_native_id()
+        os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + 10)
+    except Exception:
+        pass
+
+# Journal reader of the current worker process, opened once by _init_worker
+_worker_journal = None
+
+def _init_worker(worker_ids):
+    """Pool initializer: lower priority, pin to a core and open one reader per worker process."""
+    global _worker_journal
     try:
         os.nice(10)
     except Exception:
         pass
+    
+    # Each worker takes the next index from the shared counter and stays on
+    # its own core, so the journal pages it streams stay in that core's cache
+    with worker_ids.get_lock():
+        index = worker_ids.value
+        worker_ids.value += 1
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cores[index % len(cores)]})
+    except Exception:
+        pass
+    
+    _worker_journal = _open_reader()
 
-    start_time, end_time = args
-    events = []
+def _read_chunk(j, args):
+    """
+    Read the entries from start_cursor up to end_cursor into a LogEventBatch.
+    The last chunk has no end_cursor and stops after end_usec instead.
+    """
+    start_cursor, end_cursor, end_usec = args
+    batch = LogEventBatch()
 
-    j = systemd.journal.Reader()
     try:
-        j.seek_realtime(start_time)
+        j.seek_cursor(start_cursor)
     except Exception:
-        return events
+        return batch
 
-    for entry in j:
-        timestamp = entry.get('__REALTIME_TIMESTAMP')
-        if timestamp and timestamp > end_time:
+    # Bind the per-entry calls to locals once, since this loop runs for
+    # every journal entry. Most of the per-entry cost is fetching the fields
+    # (_get_all), so entries below HISTORY_MIN_SEVERITY are skipped on their
+    # PRIORITY alone; _append_entry then converts only the fields it keeps.
+    next_entry = j._next
+    test_cursor = j.test_cursor
+    get_realtime = j._get_realtime
+    get_field = j._get
+    get_all = j._get_all
+    convert = j._convert_field
+    append_entry = _append_entry
+    to_severity = _priority_to_severity
+    min_severity = HISTORY_MIN_SEVERITY
+
+    # Step the cursor ourselves and compare raw realtime usecs, so entries
+    # past the chunk are never fetched or converted
+    while next_entry():
+        if end_cursor and test_cursor(end_cursor):
+            break
+        realtime = get_realtime()
+        if realtime > end_usec:
             break
 
-        ev_dict = _entry_to_dict(entry)
-        if ev_dict:
-            events.append(ev_dict)
+        try:
+            severity = to_severity(get_field('PRIORITY'))
+        except KeyError:
+            severity = _INFO
+        if severity < min_severity:
+            continue
+
+        append_entry(batch, get_all(), realtime // 1_000_000, severity, convert)
+
+    return batch
 
-    return events
+def process_log_chunk(args):
+    """
+    Worker function to process one chunk of logs.
+    Returns the batch already pickled, so serialization happens in the worker.
+    """
+    return pickle.dumps(_read_chunk(_worker_journal, args), protocol=5)
 
 class SystemdSource(LogSource):
-    def __init__(self, core_allocation=1, time_period: TimePeriod = TimePeriod.ALL, custom_start_time: float = None):
+    def __init__(self, core_allocation=1, time_period: TimePeriod = TimePeriod.ALL, custom_start_time: float = None, out_q: queue.Queue = None):
+        super().__init__(out_q)
         self.cpu_count = core_allocation if core_allocation > 0 else 1
         self.journal = None
+        # Last position the consumer acknowledged; this is what gets persisted
         self.cursor = None
         
+        # Thread that feeds out_q, see LogSource
+        self._producer = None
+        self._stop_event = threading.Event()
+        
+        # Journal fd readiness, so the live tail only reads when something changed
+        self._selector = None
+        self._journal_pending = False
+        
         self.time_period = time_period
         self.custom_start_time = custom_start_time
         
-        # Thread-safe queue for historical events found by background workers
-        self.history_queue = queue.Queue(maxsize=200)
+        # Bounded buffer of LogEventBatch slices found by background workers,
+        # and the number of events in it. One condition guards both.
+        self._history = collections.deque()
+        self._history_len = 0
+        self._history_cond = threading.Condition()
         self.history_done = False
         
         # Define cursor path
         self.cursor_dir = Path(os.path.expanduser("~/.local/share/neighbor/cursors"))
         self.cursor_path = self.cursor_dir / "systemd_cursor.txt"
+        self._loaded_cursor = None
 
     def _get_scan_range(self, reader, time_period):
         """Determine start and end times for scanning based on time_period."""
-        reader.seek_tail()
-        last = reader.get_previous()
-        abs_end_time = last.get('__REALTIME_TIMESTAMP') if last else datetime.now()
+        last_time = _tail_time(reader)
+        abs_end_time = last_time or datetime.now()
         
         if time_period == TimePeriod.ALL:
-            reader.seek_head()
-            first = reader.get_next()
-            return first.get('__REALTIME_TIMESTAMP') if first else None, abs_end_time
+            return _head_time(reader), abs_end_time
                 
         elif time_period == TimePeriod.BOOT:
             reader.this_boot()
-            reader.seek_head()
-            first = reader.get_next()
-            return first.get('__REALTIME_TIMESTAMP') if first else None, abs_end_time
+            return _head_time(reader), abs_end_time
         
         elif time_period == TimePeriod.NOW:
-            reader.seek_tail()
-            last = reader.get_previous()
-            return last.get('__REALTIME_TIMESTAMP') if last else None, abs_end_time
+            return last_time, abs_end_time
 
         elif time_period == TimePeriod.CUSTOM and self.custom_start_time:
             return datetime.fromtimestamp(self.custom_start_time), abs_end_time
             
         return None, None
 
-    def _create_time_chunks(self, start_time, end_time):
-        """Split time range into chunks for parallel processing."""
-        total_duration = (end_time - start_time).total_seconds()
+    def _sample_cursors(self, start_time, end_usec):
+        """Collect the cursor of every HISTORY_SAMPLE_STRIDE-th entry in the scan range."""
+        reader = _open_reader()
+        cursors = []
+        try:
+            reader.seek_realtime(start_time)
+            if not reader._next():
+                return cursors
+            
+            # _next(n) skips inside libsystemd, only boundaries reach Python
+            while reader._get_realtime() <= end_usec:
+                cursor = reader._get_cursor()
+                if cursors and cursor == cursors[-1]:
+                    break
+                cursors.append(cursor)
+                if not reader._next(HISTORY_SAMPLE_STRIDE):
+                    break
+        finally:
+            reader.close()
         
-        if total_duration <= 5:
-            return [(start_time, end_time)]
+        return cursors
+
+    def _create_cursor_chunks(self, cursors, end_usec):
+        """Split sampled cursors into chunks holding about the same number of entries."""
+        n_chunks = min(self.cpu_count * HISTORY_CHUNKS_PER_CORE, len(cursors))
+        bounds = [cursors[i * len(cursors) // n_chunks] for i in range(n_chunks)]
         
-        chunk_size = total_duration / self.cpu_count
         chunks = []
-        current = start_time
-        
-        for i in range(self.cpu_count):
-            if i == self.cpu_count - 1:
-                next_time = end_time + timedelta(seconds=1)
-            else:
-                next_time = current + timedelta(seconds=chunk_size)
-            
-            chunks.append((current, next_time))
-            current = next_time
+        for i, start_cursor in enumerate(bounds):
+            end_cursor = bounds[i + 1] if i + 1 < n_chunks else None
+            chunks.append((start_cursor, end_cursor, end_usec))
         
         return chunks
 
+    def _history_put_many(self, batch):
+        """Add a batch to the history buffer in slices, waiting while it is full."""
+        for i in range(0, len(batch), HISTORY_PUT_BATCH):
+            part = batch if len(batch) <= HISTORY_PUT_BATCH else batch.slice(i, i + HISTORY_PUT_BATCH)
+            with self._history_cond:
+                while self._history_len >= HISTORY_QUEUE_SIZE:
+                    if self._stop_event.is_set():
+                        return
+                    self._history_cond.wait(0.5)
+                self._history.append(part)
+                self._history_len += len(part)
+
+    def _gate_tasks(self, tasks, gate):
+        """Yield tasks to the pool only while the gate has free slots."""
+        for task in tasks:
+            while not gate.acquire(timeout=0.5):
+                if self._stop_event.is_set():
+                    return
+            yield task
+
     def _scan_history_background(self, start_time, end_time):
         """Runs in a background thread. Manages the pool and pushes results to queue."""
         if not start_time or not end_time or start_time >= end_time:
             self.history_done = True
             return
 
-        chunk_args = self._create_time_chunks(start_time, end_time)
+        gate = None
 
         try:
-            with multiprocessing.Pool(processes=self.cpu_count) as pool:
-                for chunk_res in pool.imap_unordered(process_log_chunk, chunk_args):
-                    for ev_dict in chunk_res:
-                        try:
-                            self.history_queue.put(LogEvent(**ev_dict))
-                        except Exception as e:
-                            print(f"Error reformating event: {e}")
+            end_usec = int(end_time.timestamp() * 1_000_000)
+            cursors = self._sample_cursors(start_time, end_usec)
+            if not cursors:
+                return
+            chunk_args = self._create_cursor_chunks(cursors, end_usec)
+            
+            # Dispatch in groups only when there are enough chunks for every
+            # worker to get several groups; a short scan (fewer than
+            # cpu_count * 4 chunks) would otherwise leave most workers idle
+            chunksize = max(1, min(HISTORY_POOL_CHUNKSIZE, len(chunk_args) // (self.cpu_count * 4)))
+            
+            # Cap chunks in flight so finished results can't pile up in RAM
+            # faster than the history buffer is drained. Must cover at least one
+            # dispatch per worker, or the pool could never fill a batch.
+            in_flight = self.cpu_count * 2 * chunksize
+            
+            # With one core or one chunk a pool only adds fork and pickling
+            # overhead, so read the range in this thread instead
+            if self.cpu_count == 1 or len(chunk_args) == 1:
+                # Lowered here only: forked workers inherit the niceness of
+                # the forking thread and _init_worker already lowers theirs.
+                # This thread still shares the GIL with the producer thread;
+                # the live tail only needs it briefly per poll.
+                _lower_thread_priority()
+                reader = _open_reader()
+                try:
+                    for args in chunk_args:
+                        if self._stop_event.is_set():
+                            break
+                        self._history_put_many(_read_chunk(reader, args))
+                finally:
+                    reader.close()
+                return
+            
+            ctx = multiprocessing.get_context("fork")
+            worker_ids = ctx.Value('i', 0)
+            with ctx.Pool(processes=self.cpu_count, initializer=_init_worker, initargs=(worker_ids,)) as pool:
+                if sys.version_info >= (3, 15):
+                    results = pool.imap_unordered(process_log_chunk, chunk_args, chunksize=chunksize, buffersize=in_flight)
+                else:
+                    gate = threading.Semaphore(in_flight)
+                    results = pool.imap_unordered(process_log_chunk, self._gate_tasks(chunk_args, gate), chunksize=chunksize)
+
+                for chunk_res in results:
+                    if gate:
+                        gate.release()
+                    if self._stop_event.is_set():
+                        break
+                    self._history_put_many(pickle.loads(chunk_res))
         except Exception as e:
             print(f"Background scan error: {e}")
         finally:
@@ -164,9 +384,20 @@ class SystemdSource(LogSource):
         """Load cursor from file if it exists."""
         if self.cursor_path.exists():
             with open(self.cursor_path, 'r') as f:
-                return f.read().strip()
+                self._loaded_cursor = f.read().strip()
+                return self._loaded_cursor
         return None
 
+    def _save_cursor(self):
+        """Atomically replace the cursor file, so a crash never leaves a torn write."""
+        tmp_path = self.cursor_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(self.cursor)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.cursor_path)
+        self._loaded_cursor = self.cursor
+
     def _initialize_journal_position(self, reader):
         """Position the journal reader based on cursor or at tail."""
         if self.cursor:
@@ -185,10 +416,44 @@ class SystemdSource(LogSource):
         except:
             pass
 
+    def _wait_for_journal(self, timeout):
+        """Wait up to timeout seconds for the journal fd and note if new entries arrived."""
+        if self._selector.select(timeout):
+            if self.journal.process() != _journal().NOP:
+                self._journal_pending = True
+        return self._journal_pending
+
+    def _put_out(self, item):
+        """Put item on out_q, waiting while it is full. Gives up once the source is stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self.out_q.put((self, item), timeout=0.5)
+                return
+            except queue.Full:
+                pass
+
+    def _produce_events(self):
+        """
+        Runs in a background thread. Pushes new event batches to out_q as they arrive.
+        If reading fails, the exception itself is put on out_q for the consumer to raise.
+        """
+        try:
+            while not self._stop_event.is_set():
+                batch = self.poll()
+                if batch:
+                    self._put_out(batch)
+                    continue
+
+                # Nothing ready: block until the journal changes. Wake up sooner
+                # while the history scan is still filling its queue.
+                self._wait_for_journal(1.0 if self.history_done else 0.1)
+        except Exception as e:
+            self._put_out(e)
+
     def start(self):
         self.cursor_dir.mkdir(parents=True, exist_ok=True)
         self.cursor = self._load_cursor()
-        self.journal = systemd.journal.Reader()
+        self.journal = _open_reader()
         
         # Reuse same reader for determining scan range
         scan_start, scan_end = self._get_scan_range(self.journal, self.time_period)
@@ -196,6 +461,13 @@ class SystemdSource(LogSource):
         # Position main journal for new logs
         self._initialize_journal_position(self.journal)
         
+        # Entries written since the saved cursor are read on the first poll
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.journal.fileno(), selectors.EVENT_READ)
+        self._journal_pending = True
+        
+        self._stop_event.clear()
+        
         # Launch background scanner if range is valid
         if scan_start and scan_end and scan_start < scan_end:
             t = threading.Thread(target=self._scan_history_background, args=(scan_start, scan_end))
@@ -203,40 +475,74 @@ class SystemdSource(LogSource):
             t.start()
         else:
             self.history_done = True
+        
+        self._producer = threading.Thread(target=self._produce_events)
+        self._producer.daemon = True
+        self._producer.start()
 
     def poll(self):
-        events = []
-        
-        # Drain history queue (limit batch size)
-        HISTORY_BATCH_SIZE = 100
-        count = 0
-        while not self.history_queue.empty() and count < HISTORY_BATCH_SIZE:
-            try:
-                events.append(self.history_queue.get_nowait())
-                count += 1
-            except queue.Empty:
-                break
+        # Runs on the producer thread, which owns the journal handle;
+        # consumers read out_q instead of calling this.
+        # Take one buffered history slice as the start of this batch
+        with self._history_cond:
+            if self._history:
+                batch = self._history.popleft()
+                self._history_len -= len(batch)
+                self._history_cond.notify()
+            else:
+                batch = LogEventBatch()
         
         # Check for new logs
-        if not self.journal:
-            return events
+        if not self.journal or not self._wait_for_journal(0):
+            return batch
+
+        self._journal_pending = False
+        
+        # Step the reader directly instead of iterating it: iteration also
+        # fetches the cursor and monotonic time and builds a datetime for
+        # every entry. The cursor is only needed once, after the last entry,
+        # and travels with the batch until the consumer acknowledges it.
+        j = self.journal
+        read_any = False
+        while j._next():
+            read_any = True
+            entry = j._get_all()
+            _append_entry(batch, entry, j._get_realtime() // 1_000_000,
+                          _priority_to_severity(entry.get('PRIORITY')), j._convert_field)
+        
+        if read_any:
+            batch.checkpoint = j._get_cursor()
 
-        for entry in self.journal:
-            ev_dict = _entry_to_dict(entry)
-            if ev_dict:
-                events.append(LogEvent(**ev_dict))
-                self.cursor = entry.get('__CURSOR')
+        return batch
 
-        return events
+    def ack(self, checkpoint):
+        if checkpoint is not None:
+            self.cursor = checkpoint
 
     def stop(self):
-        if self.cursor:
+        self._stop_event.set()
+        producer_alive = False
+        if self._producer:
+            self._producer.join(timeout=2.0)
+            producer_alive = self._producer.is_alive()
+            self._producer = None
+        
+        if self.cursor and self.cursor != self._loaded_cursor:
             try:
-                with open(self.cursor_path, 'w') as f:
-                    f.write(self.cursor)
+                self._save_cursor()
             except Exception as e:
                 print(f"Failed to save cursor: {e}")
         
+        # The producer is still inside a journal call: closing the handles
+        # under it is unsafe, so leave them to the (daemon) thread
+        if producer_alive:
+            print("Systemd producer did not exit, leaving journal open.")
+            return
+        
+        if self._selector:
+            self._selector.close()
+            self._selector = None
+        
         if self.journal:
             self.journal.close()
             self.journal = None
@@ -3,30 +3,36 @@ This module provides a unified interface to access data from various sources.
 No storage or classification logic is implemented here, just served to the main app.
 """
 
+import queue
+from .sources.base import OUT_QUEUE_SIZE
+
 class Sources:
     def __init__(self, sources):
         # Initialize whatever the user wants to monitor
         self.sources = []
+        # Sources push event batches here as soon as they are read. Bounded,
+        # so a slow consumer blocks the sources instead of buffering everything.
+        self.out_q = queue.Queue(maxsize=OUT_QUEUE_SIZE)
         
         if "audio" in sources:
             from .sources.audio.audio_source import AudioSource
-            self.audio = AudioSource()
+            self.audio = AudioSource(out_q=self.out_q)
             self.sources.append(self.audio)
         if "kernel" in sources:
             from .sources.kernel.kernel_source import KernelSource
-            self.kernel = KernelSource()
+            self.kernel = KernelSource(out_q=self.out_q)
             self.sources.append(self.kernel)
         if "network" in sources:
             from .sources.network.network_source import NetworkSource
-            self.network = NetworkSource()
+            self.network = NetworkSource(out_q=self.out_q)
             self.sources.append(self.network)
         if "sandbox" in sources:
             from .sources.sandbox.sandbox_source import SandboxSource
-            self.sandbox = SandboxSource()
+            self.sandbox = SandboxSource(out_q=self.out_q)
             self.sources.append(self.sandbox)
         if "systemd" in sources:
             from .sources.systemd.systemd_source import SystemdSource, TimePeriod
-            self.systemd = SystemdSource(core_allocation = 8, time_period=TimePeriod.NOW)
+            self.systemd = SystemdSource(core_allocation = 8, time_period=TimePeriod.NOW, out_q=self.out_q)
             self.sources.append(self.systemd)
     
     def start(self):
@@ -35,10 +41,4 @@ class Sources:
     
     def stop(self):
         for source in self.sources:
-            source.stop()
-    
-    def poll(self):
-        events = []
-        for source in self.sources:
-            events.extend(source.poll())
-        return events
\ No newline at end of file
+            source.stop()
\ No newline at end of file